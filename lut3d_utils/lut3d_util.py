@@ -17,16 +17,26 @@
 """Utilities for examining/injecting the tone mapping metadata (3D LUT) in MP4/MOV files."""
 
 import binascii
+import contextlib
 import io
+import mmap
 import os
+import pathlib
 import struct
+import sys
 import uuid
 
+import numpy as np
+
 from lut3d_utils import mpeg
 
 MPEG_FILE_EXTENSIONS = [".mp4", ".mov"]
 FIXED_POINT_FRACTIONAL_BITS = 15
 
+# Precompiled formats of the fixed-size PRMD header fields.
+_U32BE = struct.Struct(">I")
+_HDR3 = struct.Struct(">BBB")
+
 
 class Lut3d(object):
   """A class for storing/parsing the tone mapping metadata (3D LUT).
@@ -39,29 +49,32 @@ class Lut3d(object):
       with the output RGB of the LUT specifying the nonlinear transfer function
       coefficients used to translate between RGB colour space values and YCbCr
       values.
-    connection_uuid: the UUID that is used to match with the same UUID held in a
-      referent
+    connection_uuid: the UUID (16 bytes) that is used to match with the same
+      UUID held in a referent. A random UUID is generated if none is given.
     lut_size: the size of the 1st, 2nd, and 3rd dimension of the 3D LUT (defined
       by lut_value).
     lut_value: the static 3D look-up-table (LUT) for colour mapping. The LUT
       maps an input RGB colour to an output R′G′B′ colour (big-endian). The
-      lut_value is the table entries for the LUT from the minimum to the maximum
-      input values, with the third component index changing fastest (i.e.
-      lut_value[(r_i * n * n + g_i * n + b_i) * 3 + c_i]). The 3D LUT has
-      dimensions lut_size-by-lut_size-by-lut_size-by-3.
+      lut_value is a float32 numpy.ndarray of shape (lut_size**3, 3) holding
+      the table entries for the LUT from the minimum to the maximum input
+      values, with the third component index changing fastest (i.e.
+      lut_value[r_i * n * n + g_i * n + b_i, c_i]). The 3D LUT has dimensions
+      lut_size-by-lut_size-by-lut_size-by-3.
   """
 
   def __init__(
       self,
       output_colour_primaries: mpeg.constants.ColourPrimaries = mpeg.constants.ColourPrimaries.COLOUR_PRIMARIES_UNSPECIFIED,
       output_colour_transfer_characteristics: mpeg.constants.ColourTransferCharacteristics = mpeg.constants.ColourTransferCharacteristics.COLOUR_TRANSFER_CHARACTERISTICS_UNSPECIFIED,
-      connection_uuid: str = uuid.uuid4().bytes,
+      connection_uuid: bytes | None = None,
   ):
     self.output_colour_primaries = output_colour_primaries
     self.output_colour_transfer_characteristics = (
         output_colour_transfer_characteristics
     )
-    self.connection_uuid = connection_uuid
+    self.connection_uuid = (
+        connection_uuid if connection_uuid is not None else uuid.uuid4().bytes
+    )
     self.lut_size = 0
     self.lut_value = None
 
@@ -112,46 +125,55 @@ class Lut3d(object):
     domain_min = None
     domain_max = None
     lut3d_size = -1
-    data = []
+    first_data_index = None
     # Parse keywords
-    for line in lines:
+    for index, line in enumerate(lines):
       line = line.strip()
       if not line or line.startswith("#"):
         continue
 
       elements = line.split()
-      if len(elements) != 3 and data:
-        print(
-            "Error: all keywords shall appear before any table  or the data"
-            f" vector size shall be 3! Line: {line}"
-        )
+      if len(elements) == 3:
+        first_data_index = index
+        break
+      if elements[0] == "TITLE" and title is None:
+        title = " ".join(elements[1:])[1:-1]
+      elif elements[0] == "DOMAIN_MIN" and domain_min is None:
+        domain_min = [float(x) for x in elements[1:]]
+      elif elements[0] == "DOMAIN_MAX" and domain_max is None:
+        domain_max = [float(x) for x in elements[1:]]
+      elif elements[0] == "LUT_1D_SIZE":
+        print("Error: 1D LUT is not supported!")
         return False
-      if len(elements) != 3:
-        if elements[0] == "TITLE" and title is None:
-          title = " ".join(elements[1:])[1:-1]
-        elif elements[0] == "DOMAIN_MIN" and domain_min is None:
-          domain_min = [float(x) for x in elements[1:]]
-        elif elements[0] == "DOMAIN_MAX" and domain_max is None:
-          domain_max = [float(x) for x in elements[1:]]
-        elif elements[0] == "LUT_1D_SIZE":
-          print("Error: 1D LUT is not supported!")
+      elif elements[0] == "LUT_3D_SIZE" and lut3d_size < 0:
+        if len(elements) != 2:
+          print(f"Error: LUT_3D_SIZE shall have only one param! Line: {line}")
           return False
-        elif elements[0] == "LUT_3D_SIZE" and lut3d_size < 0:
-          if len(elements) != 2:
-            print(f"Error: LUT_3D_SIZE shall have only one param! Line: {line}")
-            return False
-          lut3d_size = int(elements[1])
-          if lut3d_size < 2 or lut3d_size > 256:
-            print(
-                "Error: LUT_3D_SIZE shall be an integer in the range of"
-                f" [2,256]. Size: {lut3d_size}"
-            )
-            return False
-        else:
-          print(f"Error: Unknow keyword or repeated keyword! Line: {line}")
+        lut3d_size = int(elements[1])
+        if lut3d_size < 2 or lut3d_size > 256:
+          print(
+              "Error: LUT_3D_SIZE shall be an integer in the range of"
+              f" [2,256]. Size: {lut3d_size}"
+          )
           return False
       else:
-        data.append([float(x) for x in elements])
+        print(f"Error: Unknow keyword or repeated keyword! Line: {line}")
+        return False
+
+    # Parse the table in bulk. Any keyword or a vector that does not have
+    # exactly 3 elements after the first table line fails to parse.
+    data = np.empty((0, 3), dtype=np.float32)
+    if first_data_index is not None:
+      try:
+        data = np.loadtxt(
+            lines[first_data_index:], dtype=np.float32, comments="#", ndmin=2
+        )
+      except ValueError as e:
+        print(
+            "Error: all keywords shall appear before any table  or the data"
+            f" vector size shall be 3! Error: {e}"
+        )
+        return False
 
     if lut3d_size < 0:
       print("Error: There is no LUT_3D_SIZE in the file.")
@@ -164,15 +186,19 @@ class Lut3d(object):
           f" domain_min: {domain_min}, domain_max: {domain_max}"
       )
       return False
-    if len(data) != lut3d_size**3:
+    if data.shape[0] != lut3d_size**3:
       print(
           f"Error: The data size is not as expected. Expected: {lut3d_size}^3 ="
-          f" {lut3d_size**3}, Actual: {len(data)}"
+          f" {lut3d_size**3}, Actual: {data.shape[0]}"
       )
       return False
     self.lut_size = lut3d_size
-    self.lut_value = [data[self.shuffle_indices(i)]
-                      for i in range(self.lut_size**3)]
+    # The .cube table has the first (red) dimension changing fastest; swap the
+    # axes so that the last (blue) dimension changes fastest.
+    n = self.lut_size
+    self.lut_value = np.ascontiguousarray(
+        data.reshape(n, n, n, 3).transpose(2, 1, 0, 3)
+    ).reshape(n**3, 3)
     in_fc.close()
     return True
 
@@ -180,29 +206,29 @@ class Lut3d(object):
     """Creats a Production Metadata (PRMD) box's contents (binary) from the self attributes.
 
     Returns:
-      A binary message.
+      The box contents in bytes.
     """
-    msg = io.BytesIO()
-    msg.write(struct.pack(">I", 0))  # version and flags = (0, 0)
-    msg.write(self.connection_uuid)  # metadata_connection_uuid
-    msg.write(b"lut3")  # production_metadata_type
-    msg.write(struct.pack(">B", self.lut_size))
-    msg.write(struct.pack(">B", self.output_colour_primaries.value))
-    msg.write(
-        struct.pack(">B", self.output_colour_transfer_characteristics.value)
-    )
-    mul = 1 << FIXED_POINT_FRACTIONAL_BITS
-    lut_value_fixed_point = [
-        int(max(min(x, 1.9999), 0) * mul + 0.5)
-        for rgb in self.lut_value
-        for x in rgb
+    parts = [
+        _U32BE.pack(0),  # version and flags = (0, 0)
+        self.connection_uuid,  # metadata_connection_uuid
+        b"lut3",  # production_metadata_type
+        _HDR3.pack(
+            self.lut_size,
+            self.output_colour_primaries,
+            self.output_colour_transfer_characteristics,
+        ),
     ]
-    msg.write(
-        struct.pack(
-            ">{}H".format(len(lut_value_fixed_point)), *lut_value_fixed_point
-        )
-    )
-    return msg
+    # Quantizes the whole table at once into big-endian unsigned 16-bit
+    # fixed-point values, rounding half up, working in place on one copy.
+    lut_value_scaled = np.array(self.lut_value, dtype=np.float32).reshape(-1)
+    np.clip(lut_value_scaled, 0.0, 1.9999, out=lut_value_scaled)
+    lut_value_scaled *= 1 << FIXED_POINT_FRACTIONAL_BITS
+    lut_value_scaled += 0.5
+    lut_value_fixed_point = lut_value_scaled.astype(np.uint16)
+    if sys.byteorder == "little":
+      lut_value_fixed_point.byteswap(inplace=True)
+    parts.append(lut_value_fixed_point.tobytes())
+    return b"".join(parts)
 
   def read_from_prmd_contents(self, src):
     """Reads the atributes from a Production Metadata (PRMD) box's contents (binary).
@@ -218,7 +244,7 @@ class Lut3d(object):
       print("Not sufficient data to read!")
       return False
     msg = io.BytesIO(src)
-    version_and_flags = struct.unpack(">I", msg.read(4))
+    version_and_flags = _U32BE.unpack(msg.read(4))
     if version_and_flags[0] != 0:
       print(f"Invalid version and flags ({version_and_flags}), should be 0")
       return False
@@ -230,23 +256,37 @@ class Lut3d(object):
     if src_size - msg.tell() < 3:
       print("Not sufficient data to read!")
       return False
-    self.lut_size = struct.unpack("B", msg.read(1))[0]
-    self.output_colour_primaries = mpeg.constants.ColourPrimaries(
-        struct.unpack("B", msg.read(1))[0]
+    self.lut_size, colour_primaries, colour_transfer_characteristics = (
+        _HDR3.unpack(msg.read(3))
+    )
+    self.output_colour_primaries = (
+        mpeg.constants.COLOUR_PRIMARIES_BY_VALUE.get(colour_primaries)
     )
+    if self.output_colour_primaries is None:
+      print(f"Unknown output colour primaries: {colour_primaries}")
+      return False
     self.output_colour_transfer_characteristics = (
-        mpeg.constants.ColourTransferCharacteristics(
-            struct.unpack("B", msg.read(1))[0]
+        mpeg.constants.COLOUR_TRANSFER_CHARACTERISTICS_BY_VALUE.get(
+            colour_transfer_characteristics
         )
     )
-    if src_size - msg.tell() < 3 * pow(self.lut_size, 3) * 2:
+    if self.output_colour_transfer_characteristics is None:
+      print(
+          "Unknown output colour transfer characteristics:"
+          f" {colour_transfer_characteristics}"
+      )
+      return False
+    n3 = pow(self.lut_size, 3)
+    if src_size - msg.tell() < 3 * n3 * 2:
       print("Not sufficient data to read!")
       return False
-    self.lut_value = [[]] * pow(self.lut_size, 3)
     denum = 1 << FIXED_POINT_FRACTIONAL_BITS
-    for k in range(pow(self.lut_size, 3)):
-      self.lut_value[k] = [
-          float(struct.unpack(">H", msg.read(2))[0]) / denum for c in range(0, 3)]
+    lut_value_fixed_point = np.frombuffer(
+        src, dtype=">u2", count=3 * n3, offset=msg.tell()
+    )
+    self.lut_value = (
+        lut_value_fixed_point.astype(np.float32) * (1.0 / denum)
+    ).reshape(n3, 3)
     return True
 
   def print(self):
@@ -276,27 +316,26 @@ class Lut3d(object):
       True if succeeds. Otherwise False will be returned.
     """
 
+    # Formats the whole file in memory so that it is written with one call.
+    buf = io.StringIO()
+    buf.write(f"LUT_3D_SIZE {self.lut_size}\n")
+    # Swap the axes back so that the first (red) dimension changes fastest.
+    n = self.lut_size
+    lut_value_r_fastest = (
+        np.asarray(self.lut_value)
+        .reshape(n, n, n, 3)
+        .transpose(2, 1, 0, 3)
+        .reshape(n**3, 3)
+    )
+    np.savetxt(buf, lut_value_r_fastest, fmt="%.7f")
+
     outfile = os.path.abspath(dst)
     try:
-      out_fc = open(outfile, "w")
-    except ValueError:
-      print(
-          f"Error: failed to open {outfile}\n Error message:"
-          f" {ValueError.message}"
-      )
+      with open(outfile, "w") as out_fc:
+        out_fc.write(buf.getvalue())
+    except OSError as e:
+      print(f"Error: failed to open {outfile}\n Error message: {e}")
       return False
-
-    out_fc.write(f"LUT_3D_SIZE {self.lut_size}\n")
-    for b_major_index in range(0, len(self.lut_value)):
-      i = self.shuffle_indices(b_major_index)
-      out_fc.write(
-          "{0:.7f} {1:.7f} {2:.7f}\n".format(
-              self.lut_value[i][0],
-              self.lut_value[i][1],
-              self.lut_value[i][2],
-          )
-      )
-    out_fc.close()
     print(f"lut3d saved in file: {outfile}")
     return True
 
@@ -334,7 +373,7 @@ def prmd_box(lut3d):
   prmd_leaf = mpeg.Box()
   prmd_leaf.name = mpeg.constants.TAG_PRMD
   prmd_leaf.header_size = 8
-  prmd_leaf.contents = lut3d.create_prmd_contents().getvalue()
+  prmd_leaf.contents = lut3d.create_prmd_contents()
   prmd_leaf.content_size = len(prmd_leaf.contents)
   return prmd_leaf
 
@@ -352,11 +391,124 @@ def udta_box(lut3d):
   udta_container.name = mpeg.constants.TAG_UDTA
   udta_container.header_size = 8
   udta_container.add(prmd_box(lut3d))
-  udta_container.content_size = len(udta_container.contents)
+  udta_container.resize()
 
   return udta_container
 
 
+@contextlib.contextmanager
+def _map_file(fh):
+  """Memory-maps a file opened for reading for the duration of a with-block.
+
+  The mmap supports the same seek/read/tell calls as the file handle, but the
+  many small reads made while walking the boxes are served from the page
+  cache instead of going through a system call each. The mmap is closed on
+  exit; fh itself is left open.
+
+  Args:
+    fh: a file handle opened in binary read mode.
+
+  Yields:
+    A read-only mmap of the whole file, or fh itself if the file cannot be
+    mapped (e.g. an empty file or a pipe).
+  """
+  try:
+    mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+  except (OSError, ValueError):
+    yield fh
+    return
+  with mapped:
+    yield mapped
+
+
+def _is_video_mdia(mdia, in_fh):
+  """Checks whether a media box (mdia) has a video handler (hdlr).
+
+  Args:
+    mdia: the media container box of a track.
+    in_fh: file handle to read uncached file contents.
+
+  Returns:
+    True if the handler type of the media is video.
+  """
+  for hdlr in mdia.index.get(mpeg.constants.TAG_HDLR, []):
+    in_fh.seek(hdlr.content_start() + 8)
+    if in_fh.read(4) == mpeg.constants.TRAK_TYPE_VIDE:
+      return True
+  return False
+
+
+def _visual_sample_entries(mdia):
+  """Yields the visual sample entry boxes of a media box (mdia).
+
+  Args:
+    mdia: the media container box of a track.
+
+  Yields:
+    The visual sample entry boxes found in mdia/minf/stbl/stsd.
+  """
+  visual_sample_entry_types = mpeg.constants.VISUAL_SAMPLE_ENTRY_TYPES
+  for minf in mdia.index.get(mpeg.constants.TAG_MINF, []):
+    for stbl in minf.index.get(mpeg.constants.TAG_STBL, []):
+      for stsd in stbl.index.get(mpeg.constants.TAG_STSD, []):
+        for stsd_sub_element in stsd.contents:
+          if stsd_sub_element.name in visual_sample_entry_types:
+            yield stsd_sub_element
+
+
+def _video_mdia(trak, in_fh):
+  """Returns the first video media box (mdia) of a track or None."""
+  for mdia in trak.index.get(mpeg.constants.TAG_MDIA, []):
+    if _is_video_mdia(mdia, in_fh):
+      return mdia
+  return None
+
+
+def _find_video_traks(moov, in_fh):
+  """Yields the video track boxes (trak) of a movie box (moov).
+
+  Args:
+    moov: the movie container box.
+    in_fh: file handle to read uncached file contents.
+
+  Yields:
+    The track boxes that have a video media box.
+  """
+  for trak in moov.index.get(mpeg.constants.TAG_TRAK, []):
+    if _video_mdia(trak, in_fh) is not None:
+      yield trak
+
+
+def _find_prmr_uuids(trak, in_fh):
+  """Reads the UUIDs of the Production Metadata Reference boxes (prmr) of a track.
+
+  Args:
+    trak: the track container box.
+    in_fh: file handle to read uncached file contents.
+
+  Returns:
+    A list of the connection UUIDs referenced by the visual sample entries.
+  """
+  ref_uuid = []
+  for mdia in trak.index.get(mpeg.constants.TAG_MDIA, []):
+    for visual_sample_entry in _visual_sample_entries(mdia):
+      for prmr in visual_sample_entry.index.get(mpeg.constants.TAG_PRMR, []):
+        if prmr.content_size != 20:
+          print(f"prmr box is incorrect size {prmr.content_size} != 20")
+        else:
+          in_fh.seek(prmr.content_start() + 4)  # Seek past version and flags
+          ref_uuid.append(in_fh.read(prmr.content_size - 4))
+  return ref_uuid
+
+
+def _find_prmd(trak):
+  """Returns the first Production Metadata box (prmd) of a track or None."""
+  for udta in trak.index.get(mpeg.constants.TAG_UDTA, []):
+    for prmd in udta.index.get(mpeg.constants.TAG_PRMD, []):
+      return prmd
+  return None
+
+
 def mpeg4_add_lut3d(mpeg4_file, in_fh, lut3d):
   """Adds a lut3d metadata to an mpeg4 file for all video tracks.
 
@@ -365,6 +517,9 @@ def mpeg4_add_lut3d(mpeg4_file, in_fh, lut3d):
   crates and adds a corresponding Production Metadata Reference box (prmr) to
   the visual sample entry box.
 
+  Container add() and remove() do not update box sizes, so all edits are
+  made first and the whole tree is resized once at the end.
+
   Args:
     mpeg4_file: mpeg4 file structure to add lut3d.
     in_fh: file handle to read uncached file contents.
@@ -373,55 +528,37 @@ def mpeg4_add_lut3d(mpeg4_file, in_fh, lut3d):
   Returns:
     True if succeeds. Otherwise False will be returned.
   """
-  injected = False
-  for element in mpeg4_file.moov_box.contents:
-    if element.name == mpeg.constants.TAG_TRAK:
-      added = False
-      for sub_element in element.contents:
-        if sub_element.name != mpeg.constants.TAG_MDIA:
-          continue
-        for mdia_sub_element in sub_element.contents:
-          if mdia_sub_element.name != mpeg.constants.TAG_HDLR:
-            continue
-          position = mdia_sub_element.content_start() + 8
-          in_fh.seek(position)
-          if in_fh.read(4) == mpeg.constants.TRAK_TYPE_VIDE:
-            added = True
-            break
-        if added:
-          for mdia_sub_element in sub_element.contents:
-            if mdia_sub_element.name != mpeg.constants.TAG_MINF:
-              continue
-            for minf_sub_element in mdia_sub_element.contents:
-              if minf_sub_element.name != mpeg.constants.TAG_STBL:
-                continue
-              for stbl_sub_element in minf_sub_element.contents:
-                if stbl_sub_element.name != mpeg.constants.TAG_STSD:
-                  continue
-                for stsd_sub_element in stbl_sub_element.contents:
-                  if (
-                      stsd_sub_element.name
-                      in mpeg.constants.VISUAL_SAMPLE_ENTRY_TYPES
-                  ):
-                    stsd_sub_element.remove(mpeg.constants.TAG_PRMR)
-                    stsd_sub_element.add(prmr_box(lut3d.connection_uuid))
-                    print("Successfully added prmr box to Visual Sample Entry.")
-
-      if added:
-        add_udta = True
-        for sub_element in element.contents:
-          if sub_element.name == mpeg.constants.TAG_UDTA:
-            add_udta = False
-            sub_element.remove(mpeg.constants.TAG_PRMD)
-            sub_element.add(prmd_box(lut3d))
-            print("Successfully added lut3d to prmd box.")
-        if add_udta:
-          element.add(udta_box(lut3d))
-          print("Successfully added udta box.")
-        injected = True
+  # Scans the tree first, collecting (parent box, tag to replace or None,
+  # new box) edits, so that the tree is not changed while it is walked.
+  edits = []
+  for trak in mpeg4_file.moov_box.index.get(mpeg.constants.TAG_TRAK, []):
+    mdia = _video_mdia(trak, in_fh)
+    if mdia is None:
+      continue
+    for visual_sample_entry in _visual_sample_entries(mdia):
+      edits.append((
+          visual_sample_entry,
+          mpeg.constants.TAG_PRMR,
+          prmr_box(lut3d.connection_uuid),
+      ))
+
+    udtas = trak.index.get(mpeg.constants.TAG_UDTA, [])
+    for udta in udtas:
+      edits.append((udta, mpeg.constants.TAG_PRMD, prmd_box(lut3d)))
+    if not udtas:
+      edits.append((trak, None, udta_box(lut3d)))
+
+  added = {}
+  for parent, tag, new_box in edits:
+    if tag is not None:
+      parent.remove(tag)
+    parent.add(new_box)
+    added[new_box.name] = added.get(new_box.name, 0) + 1
+  for name, count in added.items():
+    print(f"Successfully added {count} {name.decode()} box(es).")
 
   mpeg4_file.resize()
-  return injected
+  return bool(edits)
 
 
 def inject_lut3d_mpeg4(input_file, output_file, lut3d):
@@ -436,43 +573,39 @@ def inject_lut3d_mpeg4(input_file, output_file, lut3d):
     True if succeeds. Otherwise False will be returned.
   """
 
-  infile = os.path.abspath(input_file)
-  outfile = os.path.abspath(output_file)
+  infile = pathlib.Path(input_file).absolute()
+  outfile = pathlib.Path(output_file).absolute()
 
-  if infile == outfile:
+  if infile.resolve() == outfile.resolve():
     print("Error: Input and output cannot be the same")
     return False
 
-  try:
-    in_fh = open(infile, "rb")
-  except IOError:
-    print(f"Error: {infile} does not exist or we do not have permission.")
-    return False
-
   print(f"Processing: {infile}")
 
-  extension = os.path.splitext(infile)[1].lower()
-
-  if extension not in MPEG_FILE_EXTENSIONS:
+  if infile.suffix.lower() not in MPEG_FILE_EXTENSIONS:
     print("Error: Unknown file type")
     return False
-  with open(infile, "rb") as in_fh:
-    mpeg4_file = mpeg.load(in_fh)
+
+  try:
+    in_fh = open(str(infile), "rb")
+  except IOError:
+    print(f"Error: {infile} does not exist or we do not have permission.")
+    return False
+  with in_fh, _map_file(in_fh) as src:
+    mpeg4_file = mpeg.load(src)
     if mpeg4_file is None:
       print("Error: file could not be opened.")
       return False
 
-    if not mpeg4_add_lut3d(mpeg4_file, in_fh, lut3d):
+    if not mpeg4_add_lut3d(mpeg4_file, src, lut3d):
       print("Error failed to insert lut3d data")
       return False
 
-    with open(outfile, "wb") as out_fh:
-      mpeg4_file.save(in_fh, out_fh)
+    with open(str(outfile), "wb") as out_fh:
+      mpeg4_file.save(src, out_fh)
     print(f"Injected the lut3d to file: {outfile}")
     return True
 
-  return inject_lut3d_mpeg4(infile, outfile, lut3d)
-
 
 def parse_lut3d_mpeg4(input_file):
   """Parses a lut3d metadata from an mpeg4 file.
@@ -487,84 +620,35 @@ def parse_lut3d_mpeg4(input_file):
     the parsed lut3d in a Lut3d object or None if not found.
   """
 
-  infile = os.path.abspath(input_file)
+  infile = pathlib.Path(input_file).absolute()
+  print(f"Parsing: {infile}")
+
+  if infile.suffix.lower() not in MPEG_FILE_EXTENSIONS:
+    print("Error: Unknown file type")
+    return None
+
   try:
-    in_fh = open(infile, "rb")
-    in_fh.close()
-  except IOError:
+    in_fh = open(str(infile), "rb")
+  except IOError as e:
     print(
         f"Error: {infile} does not exist or we do not have permission. Error:"
-        f" {Error.mro()}"
+        f" {e}"
     )
     return None
-
-  print(f"Parsing: {infile}")
-
-  extension = os.path.splitext(infile)[1].lower()
-
-  if extension not in MPEG_FILE_EXTENSIONS:
-    print("Error: Unknown file type")
-    return None
-  with open(input_file, "rb") as in_fh:
-    mpeg4_file = mpeg.load(in_fh)
+  with in_fh, _map_file(in_fh) as src:
+    mpeg4_file = mpeg.load(src)
     if mpeg4_file is None:
       print("Error: file could not be opened.")
       return None
-    ref_uuid = []
-    for element in mpeg4_file.moov_box.contents:
-      if element.name == mpeg.constants.TAG_TRAK:
-        parse = False
-        for sub_element in element.contents:
-          if sub_element.name != mpeg.constants.TAG_MDIA:
-            continue
-          for mdia_sub_element in sub_element.contents:
-            if mdia_sub_element.name != mpeg.constants.TAG_HDLR:
-              continue
-            position = mdia_sub_element.content_start() + 8
-            in_fh.seek(position)
-            if in_fh.read(4) == mpeg.constants.TRAK_TYPE_VIDE:
-              parse = True
-              break
-          if parse:
-            for mdia_sub_element in sub_element.contents:
-              if mdia_sub_element.name != mpeg.constants.TAG_MINF:
-                continue
-              for minf_sub_element in mdia_sub_element.contents:
-                if minf_sub_element.name != mpeg.constants.TAG_STBL:
-                  continue
-                for stbl_sub_element in minf_sub_element.contents:
-                  if stbl_sub_element.name != mpeg.constants.TAG_STSD:
-                    continue
-                  for stsd_sub_element in stbl_sub_element.contents:
-                    if (
-                        stsd_sub_element.name
-                        in mpeg.constants.VISUAL_SAMPLE_ENTRY_TYPES
-                    ):
-                      for vse_sub_element in stsd_sub_element.contents:
-                        if vse_sub_element.name == mpeg.constants.TAG_PRMR:
-                          position = vse_sub_element.content_start()
-                          if vse_sub_element.content_size != 20:
-                            print(f"prmr box is incorrect size {vse_sub_element.content_size} != 20")
-                          else:
-                            in_fh.seek(position + 4)  # Seek past version and flags
-                            ref_uuid.append(
-                                in_fh.read(vse_sub_element.content_size - 4)
-                            )
-        if parse:
-          for sub_element in element.contents:
-            if sub_element.name == mpeg.constants.TAG_UDTA:
-              for udta_sub_element in sub_element.contents:
-                if udta_sub_element.name == mpeg.constants.TAG_PRMD:
-                  lut3d = Lut3d()
-                  position = udta_sub_element.content_start()
-                  in_fh.seek(position)
-                  if not lut3d.read_from_prmd_contents(
-                      in_fh.read(udta_sub_element.content_size)
-                  ):
-                    return None
-                  if lut3d.connection_uuid not in ref_uuid:
-                    print(
-                        "Warning: No ref UUID was matched for the parsed lut3d!"
-                    )
-                  return lut3d
+    for trak in _find_video_traks(mpeg4_file.moov_box, src):
+      prmd = _find_prmd(trak)
+      if prmd is None:
+        continue
+      lut3d = Lut3d()
+      src.seek(prmd.content_start())
+      if not lut3d.read_from_prmd_contents(src.read(prmd.content_size)):
+        return None
+      if lut3d.connection_uuid not in _find_prmr_uuids(trak, src):
+        print("Warning: No ref UUID was matched for the parsed lut3d!")
+      return lut3d
   return None
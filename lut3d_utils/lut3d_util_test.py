@@ -1,23 +1,20 @@
-import math
+import os
+import shutil
 import tempfile
 import unittest
 
+import numpy as np
+
 from lut3d_utils import lut3d_util
 from lut3d_utils import mpeg
 from lut3d_utils.lut3d_util import Lut3d
 
 
 def compute_lut_diff(lut1, lut2):
-  rmse = 0
-  max_abs_diff = 0
-
-  for i in range(0, len(lut1.lut_value)):
-    for j in range(0, 3):
-      diff = lut1.lut_value[i][j] - lut2.lut_value[i][j]
-      max_abs_diff = max(max_abs_diff, max(abs(diff), max_abs_diff))
-      rmse += diff * diff
-
-  return math.sqrt(diff / len(lut1.lut_value)), max_abs_diff
+  diff = np.asarray(lut1.lut_value) - np.asarray(lut2.lut_value)
+  rmse = float(np.sqrt((diff * diff).mean()))
+  max_abs_diff = float(np.abs(diff).max())
+  return rmse, max_abs_diff
 
 
 class TestLut3dUtil(unittest.TestCase):
@@ -29,6 +26,49 @@ class TestLut3dUtil(unittest.TestCase):
         )
     )
 
+  def testFailsOnMissingMpeg4Input(self):
+    self.assertFalse(
+        lut3d_util.inject_lut3d_mpeg4(
+            '/path/to/invalid/file.mp4', '/dev/null', None
+        )
+    )
+    self.assertIsNone(
+        lut3d_util.parse_lut3d_mpeg4('/path/to/invalid/file.mp4')
+    )
+
+  def testInjectAndParseThroughSymlinks(self):
+    lut = Lut3d()
+    self.assertTrue(
+        lut.read_from_cube_file(
+            'lut3d_utils/data/hlg_bt2020_to_bt709_33x33x33.cube'
+        )
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      # Symlinked .mp4 files whose targets have no extension.
+      input_blob = os.path.join(tmp_dir, 'input_blob')
+      shutil.copyfile('lut3d_utils/data/testsrc_1920x1080.mp4', input_blob)
+      input_file = os.path.join(tmp_dir, 'input.mp4')
+      os.symlink(input_blob, input_file)
+      output_blob = os.path.join(tmp_dir, 'output_blob')
+      output_file = os.path.join(tmp_dir, 'output.mp4')
+      os.symlink(output_blob, output_file)
+
+      self.assertTrue(
+          lut3d_util.inject_lut3d_mpeg4(input_file, output_blob, lut)
+      )
+      self.assertIsNotNone(lut3d_util.parse_lut3d_mpeg4(output_file))
+      self.assertFalse(
+          lut3d_util.inject_lut3d_mpeg4(input_file, input_blob, lut)
+      )
+
+  def testFailsOnTruncatedInput(self):
+    with open('lut3d_utils/data/testsrc_1920x1080.mp4', 'rb') as f:
+      contents = f.read()
+    with tempfile.NamedTemporaryFile(suffix='.mp4') as input_file:
+      input_file.write(contents + b'\x00\x00\x00\x10m')
+      input_file.flush()
+      self.assertIsNone(lut3d_util.parse_lut3d_mpeg4(input_file.name))
+
   def testReadWriteCube(self):
     lut = Lut3d()
     with tempfile.NamedTemporaryFile(suffix='.cube') as f:
@@ -47,6 +87,84 @@ class TestLut3dUtil(unittest.TestCase):
       self.assertLess(rmse, 1e-6)
       self.assertLess(max_abs_diff, 1e-6)
 
+  def testDefaultConnectionUuidIsUniquePerInstance(self):
+    self.assertEqual(len(Lut3d().connection_uuid), 16)
+    self.assertNotEqual(Lut3d().connection_uuid, Lut3d().connection_uuid)
+
+  def testColourTagsStoreNameAndValueOnMember(self):
+    primaries = mpeg.constants.ColourPrimaries.COLOUR_PRIMARIES_BT2020
+    self.assertEqual(
+        vars(primaries), {'name': 'COLOUR_PRIMARIES_BT2020', 'value': 9}
+    )
+    self.assertIs(mpeg.constants.ColourPrimaries(9), primaries)
+    self.assertIs(
+        mpeg.constants.ColourPrimaries['COLOUR_PRIMARIES_BT2020'], primaries
+    )
+    self.assertRaises(ValueError, mpeg.constants.ColourPrimaries, 3)
+    with self.assertRaises(AttributeError):
+      primaries.name = 'COLOUR_PRIMARIES_BT709'
+    self.assertIs(mpeg.constants.COLOUR_PRIMARIES_BY_VALUE[9], primaries)
+    with self.assertRaises(TypeError):
+      mpeg.constants.COLOUR_PRIMARIES_BY_VALUE[3] = primaries
+
+  def testColourTagsSupportEnumClassApi(self):
+    primaries = mpeg.constants.ColourPrimaries
+    members = list(primaries)
+    self.assertEqual(len(members), len(primaries))
+    self.assertIs(members[0], primaries.COLOUR_PRIMARIES_BT709)
+    self.assertEqual(
+        {m.value: m for m in primaries},
+        dict(mpeg.constants.COLOUR_PRIMARIES_BY_VALUE),
+    )
+    self.assertIs(
+        primaries.__members__['COLOUR_PRIMARIES_JEDEC_P22'],
+        primaries.COLOUR_PRIMARIES_JEDEC_P22,
+    )
+
+  def testColourTagsCompareAsInts(self):
+    transfer = (
+        mpeg.constants.ColourTransferCharacteristics.COLOUR_TRANSFER_CHARACTERISTICS_ARIB_STD_B67
+    )
+    self.assertIsInstance(transfer, int)
+    self.assertEqual(transfer, 18)
+    self.assertEqual(hash(transfer), hash(18))
+
+  def testReadCubeStoresFloat32Array(self):
+    lut = Lut3d()
+    self.assertTrue(
+        lut.read_from_cube_file(
+            'lut3d_utils/data/hlg_bt2020_to_bt709_33x33x33.cube'
+        )
+    )
+    self.assertIsInstance(lut.lut_value, np.ndarray)
+    self.assertEqual(lut.lut_value.dtype, np.float32)
+    self.assertEqual(lut.lut_value.shape, (33**3, 3))
+
+  def testReadPrmdContentsRowsAreIndependent(self):
+    lut = Lut3d()
+    self.assertTrue(
+        lut.read_from_cube_file(
+            'lut3d_utils/data/hlg_bt2020_to_bt709_33x33x33.cube'
+        )
+    )
+    actual_lut = Lut3d()
+    self.assertTrue(
+        actual_lut.read_from_prmd_contents(lut.create_prmd_contents())
+    )
+    second_row = actual_lut.lut_value[1].copy()
+    actual_lut.lut_value[0] = [1.0, 1.0, 1.0]
+    np.testing.assert_array_equal(actual_lut.lut_value[1], second_row)
+
+  def testContainerIndexTracksAddAndRemove(self):
+    udta = mpeg.Container()
+    udta.name = mpeg.constants.TAG_UDTA
+    self.assertEqual(udta.index, {})
+    prmr = lut3d_util.prmr_box(b'\x00' * 16)
+    udta.add(prmr)
+    self.assertEqual(udta.index, {mpeg.constants.TAG_PRMR: [prmr]})
+    udta.remove(mpeg.constants.TAG_PRMR)
+    self.assertEqual(udta.index, {})
+
   def testInsertMetadata(self):
     lut = Lut3d(
         output_colour_primaries=mpeg.constants.ColourPrimaries.COLOUR_PRIMARIES_BT709,
@@ -72,8 +190,10 @@ class TestLut3dUtil(unittest.TestCase):
       self.assertTrue(actual_lut != None)
       self.assertEqual(actual_lut.lut_size, lut.lut_size)
 
+      # The PRMD box stores 1.15 fixed-point values, so entries are only
+      # recovered up to half a quantization step (2^-16).
       rmse, max_abs_diff = compute_lut_diff(lut, actual_lut)
-      self.assertLess(rmse, 1e-6)
+      self.assertLess(rmse, 1e-5)
       self.assertLess(max_abs_diff, 2e-5)
 
 
@@ -0,0 +1,161 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright 2023 Google LLC All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""MPEG-4 colour primaries and transfer characteristics tags."""
+
+import types
+
+
+class _IntTagType(type):
+  """Metaclass providing the Enum class API of the tag namespaces.
+
+  Only class-level operations are defined here; member attribute reads and
+  comparisons do not go through it.
+  """
+
+  def __getitem__(cls, name):
+    return cls._member_map_[name]
+
+  def __iter__(cls):
+    return iter(cls._value2member_map_.values())
+
+  def __len__(cls):
+    return len(cls._value2member_map_)
+
+  @property
+  def __members__(cls):
+    return types.MappingProxyType(cls._member_map_)
+
+
+class _IntTag(int, metaclass=_IntTagType):
+  """Base class for the integer tag namespaces below.
+
+  A lightweight replacement for enum.Enum. The public int attributes of a
+  subclass body are turned into instances of the subclass once, at class
+  creation, and kept in plain dicts. Members are ints with plain name and
+  value attributes, so reading and comparing them involves no Enum metaclass
+  or descriptor machinery. As with Enum, Tag(value) and Tag["NAME"] return the
+  member, iterating or len() covers the members in definition order,
+  __members__ maps names to members, and members are read-only.
+  """
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls._member_map_ = {}
+    cls._value2member_map_ = {}
+    for name, value in list(vars(cls).items()):
+      if name.startswith("_") or type(value) is not int:
+        continue
+      member = int.__new__(cls, value)
+      # Bypasses __setattr__, which rejects any later change.
+      member.__dict__.update(name=name, value=value)
+      setattr(cls, name, member)
+      cls._member_map_[name] = member
+      cls._value2member_map_.setdefault(value, member)
+
+  def __new__(cls, value):
+    try:
+      return cls._value2member_map_[value]
+    except KeyError:
+      raise ValueError(f"{value!r} is not a valid {cls.__name__}") from None
+
+  def __setattr__(self, name, value):
+    raise AttributeError(f"cannot set {name!r} on {self!r}")
+
+  def __delattr__(self, name):
+    raise AttributeError(f"cannot delete {name!r} from {self!r}")
+
+  def __repr__(self):
+    return f"<{type(self).__name__}.{self.name}: {self.value}>"
+
+  def __str__(self):
+    return f"{type(self).__name__}.{self.name}"
+
+
+class ColourPrimaries(_IntTag):
+  """
+
+  """
+  # Also ITU-R BT1361 / IEC 61966-2-4 / SMPTE RP177 Annex B.
+  COLOUR_PRIMARIES_BT709 = 1
+  COLOUR_PRIMARIES_UNSPECIFIED = 2
+  COLOUR_PRIMARIES_BT470M = 4
+  # Also ITU-R BT601-6 625 / ITU-R BT1358 625 / ITU-R BT1700 625 PAL & SECAM.
+  COLOUR_PRIMARIES_BT470BG = 5
+  # Also ITU-R BT601-6 525 / ITU-R BT1358 525 / ITU-R BT1700 NTSC.
+  COLOUR_PRIMARIES_SMPTE170M = 6
+  # Functionally identical to above.
+  COLOUR_PRIMARIES_SMPTE240M = 7
+  # Colour filters using Illuminant C.
+  COLOUR_PRIMARIES_FILM = 8
+  # ITU-R BT2020.
+  COLOUR_PRIMARIES_BT2020 = 9
+  # SMPTE ST428-1.
+  COLOUR_PRIMARIES_SMPTEST428_1 = 10
+  # SMPTE ST431-2
+  COLOUR_PRIMARIES_SMPTE431 = 11
+  # SMPTE ST432-1
+  COLOUR_PRIMARIES_SMPTE432 = 12
+  # JEDEC P22 phosphors
+  COLOUR_PRIMARIES_JEDEC_P22 = 22
+
+
+class ColourTransferCharacteristics(_IntTag):
+  """
+
+  """
+  COLOUR_TRANSFER_CHARACTERISTICS_BT709 = 1
+  COLOUR_TRANSFER_CHARACTERISTICS_UNSPECIFIED = 2
+  # Also ITU-R BT470M / ITU-R BT1700 625 PAL & SECAM.
+  COLOUR_TRANSFER_CHARACTERISTICS_GAMMA22 = 4
+  # Also ITU-R BT470BG.
+  COLOUR_TRANSFER_CHARACTERISTICS_GAMMA28 = 5
+  # Also ITU-R BT601-6 525 or 625 / ITU-R BT1358 525 or 625 / ITU-R
+  #   BT1700 NTSC.
+  COLOUR_TRANSFER_CHARACTERISTICS_SMPTE170M = 6
+  COLOUR_TRANSFER_CHARACTERISTICS_SMPTE240M = 7
+  # Linear transfer characteristics.
+  COLOUR_TRANSFER_CHARACTERISTICS_LINEAR = 8
+  # Logarithmic transfer characteristic (100:1 range).
+  COLOUR_TRANSFER_CHARACTERISTICS_LOG = 9
+  # Logarithmic transfer characteristic (100 * Sqrt(10) : 1 range).
+  COLOUR_TRANSFER_CHARACTERISTICS_LOG_SQRT = 10
+  # IEC 61966-2-4.
+  COLOUR_TRANSFER_CHARACTERISTICS_IEC61966_2_4 = 11
+  # ITU-R BT1361 Extended Colour Gamut.
+  COLOUR_TRANSFER_CHARACTERISTICS_BT1361_ECG = 12
+  # IEC 61966-2-1 (sRGB or sYCC).
+  COLOUR_TRANSFER_CHARACTERISTICS_IEC61966_2_1 = 13
+  # ITU-R BT2020 for 10 bit system.
+  COLOUR_TRANSFER_CHARACTERISTICS_BT2020_10 = 14
+  # ITU-R BT2020 for 12 bit system.
+  COLOUR_TRANSFER_CHARACTERISTICS_BT2020_12 = 15
+  # SMPTE ST 2084 for 10, 12, 14 and 16 bit systems.
+  COLOUR_TRANSFER_CHARACTERISTICS_SMPTEST2084 = 16
+  # SMPTE ST 428-1.
+  COLOUR_TRANSFER_CHARACTERISTICS_SMPTEST428_1 = 17
+  # ARIB STD-B67, known as "Hybrid log-gamma".
+  COLOUR_TRANSFER_CHARACTERISTICS_ARIB_STD_B67 = 18
+
+
+# Read-only views of the colour tags by their integer value, for decoding
+# values read from a file with a single lookup.
+COLOUR_PRIMARIES_BY_VALUE = types.MappingProxyType(
+    ColourPrimaries._value2member_map_
+)
+COLOUR_TRANSFER_CHARACTERISTICS_BY_VALUE = types.MappingProxyType(
+    ColourTransferCharacteristics._value2member_map_
+)
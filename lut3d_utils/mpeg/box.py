@@ -42,7 +42,7 @@ def load(fh, position, end):
   fh.seek(position)
   header_size = 8
   size = struct.unpack(">I", fh.read(4))[0]
-  name = fh.read(4)
+  name = constants.intern_tag(fh.read(4))
 
   if size == 1:
     size = struct.unpack(">Q", fh.read(8))[0]
@@ -16,128 +16,83 @@
 # limitations under the License.
 """MPEG-4 constants."""
 
-from enum import Enum
+import itertools
+from typing import Final
 
+# The colour tag classes live in _colour and are only imported on first
+# access (PEP 562), as most users of this module only need the box tags.
+_COLOUR_NAMES = frozenset((
+    "ColourPrimaries",
+    "ColourTransferCharacteristics",
+    "COLOUR_PRIMARIES_BY_VALUE",
+    "COLOUR_TRANSFER_CHARACTERISTICS_BY_VALUE",
+    ))
 
-class ColourPrimaries(Enum):
-  """
 
-  """
-  # Also ITU-R BT1361 / IEC 61966-2-4 / SMPTE RP177 Annex B.
-  COLOUR_PRIMARIES_BT709 = 1
-  COLOUR_PRIMARIES_UNSPECIFIED = 2
-  COLOUR_PRIMARIES_BT470M = 4
-  # Also ITU-R BT601-6 625 / ITU-R BT1358 625 / ITU-R BT1700 625 PAL & SECAM.
-  COLOUR_PRIMARIES_BT470BG = 5
-  # Also ITU-R BT601-6 525 / ITU-R BT1358 525 / ITU-R BT1700 NTSC.
-  COLOUR_PRIMARIES_SMPTE170M = 6
-  # Functionally identical to above.
-  COLOUR_PRIMARIES_SMPTE240M = 7
-  # Colour filters using Illuminant C.
-  COLOUR_PRIMARIES_FILM = 8
-  # ITU-R BT2020.
-  COLOUR_PRIMARIES_BT2020 = 9
-  # SMPTE ST428-1.
-  COLOUR_PRIMARIES_SMPTEST428_1 = 10
-  # SMPTE ST431-2
-  COLOUR_PRIMARIES_SMPTE431 = 11
-  # SMPTE ST432-1
-  COLOUR_PRIMARIES_SMPTE432 = 12
-  # JEDEC P22 phosphors
-  COLOUR_PRIMARIES_JEDEC_P22 = 22
-
-
-class ColourTransferCharacteristics(Enum):
-  """
+def __getattr__(name):
+  """Imports the colour tags on first access and caches them here."""
+  if name in _COLOUR_NAMES:
+    from lut3d_utils.mpeg import _colour
+    value = getattr(_colour, name)
+    globals()[name] = value
+    return value
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-  """
-  COLOUR_TRANSFER_CHARACTERISTICS_BT709 = 1
-  COLOUR_TRANSFER_CHARACTERISTICS_UNSPECIFIED = 2
-  # Also ITU-R BT470M / ITU-R BT1700 625 PAL & SECAM.
-  COLOUR_TRANSFER_CHARACTERISTICS_GAMMA22 = 4
-  # Also ITU-R BT470BG.
-  COLOUR_TRANSFER_CHARACTERISTICS_GAMMA28 = 5
-  # Also ITU-R BT601-6 525 or 625 / ITU-R BT1358 525 or 625 / ITU-R
-  #   BT1700 NTSC.
-  COLOUR_TRANSFER_CHARACTERISTICS_SMPTE170M = 6
-  COLOUR_TRANSFER_CHARACTERISTICS_SMPTE240M = 7
-  # Linear transfer characteristics.
-  COLOUR_TRANSFER_CHARACTERISTICS_LINEAR = 8
-  # Logarithmic transfer characteristic (100:1 range).
-  COLOUR_TRANSFER_CHARACTERISTICS_LOG = 9
-  # Logarithmic transfer characteristic (100 * Sqrt(10) : 1 range).
-  COLOUR_TRANSFER_CHARACTERISTICS_LOG_SQRT = 10
-  # IEC 61966-2-4.
-  COLOUR_TRANSFER_CHARACTERISTICS_IEC61966_2_4 = 11
-  # ITU-R BT1361 Extended Colour Gamut.
-  COLOUR_TRANSFER_CHARACTERISTICS_BT1361_ECG = 12
-  # IEC 61966-2-1 (sRGB or sYCC).
-  COLOUR_TRANSFER_CHARACTERISTICS_IEC61966_2_1 = 13
-  # ITU-R BT2020 for 10 bit system.
-  COLOUR_TRANSFER_CHARACTERISTICS_BT2020_10 = 14
-  # ITU-R BT2020 for 12 bit system.
-  COLOUR_TRANSFER_CHARACTERISTICS_BT2020_12 = 15
-  # SMPTE ST 2084 for 10, 12, 14 and 16 bit systems.
-  COLOUR_TRANSFER_CHARACTERISTICS_SMPTEST2084 = 16
-  # SMPTE ST 428-1.
-  COLOUR_TRANSFER_CHARACTERISTICS_SMPTEST428_1 = 17
-  # ARIB STD-B67, known as "Hybrid log-gamma".
-  COLOUR_TRANSFER_CHARACTERISTICS_ARIB_STD_B67 = 18
-
-TRAK_TYPE_VIDE = b"vide"
+
+TRAK_TYPE_VIDE: Final = b"vide"
 
 # Leaf types.
-TAG_STCO = b"stco"
-TAG_CO64 = b"co64"
-TAG_FREE = b"free"
-TAG_MDAT = b"mdat"
-TAG_XML = b"xml "
-TAG_HDLR = b"hdlr"
-TAG_FTYP = b"ftyp"
-TAG_ESDS = b"esds"
-TAG_SOUN = b"soun"
-TAG_SA3D = b"SA3D"
-TAG_PRMD = b"prmd"
-TAG_PRMR = b"prmr"
+TAG_STCO: Final = b"stco"
+TAG_CO64: Final = b"co64"
+TAG_FREE: Final = b"free"
+TAG_MDAT: Final = b"mdat"
+TAG_XML: Final = b"xml "
+TAG_HDLR: Final = b"hdlr"
+TAG_FTYP: Final = b"ftyp"
+TAG_ESDS: Final = b"esds"
+TAG_SOUN: Final = b"soun"
+TAG_SA3D: Final = b"SA3D"
+TAG_PRMD: Final = b"prmd"
+TAG_PRMR: Final = b"prmr"
 
 # Container types.
-TAG_MOOV = b"moov"
-TAG_UDTA = b"udta"
-TAG_META = b"meta"
-TAG_TRAK = b"trak"
-TAG_MDIA = b"mdia"
-TAG_MINF = b"minf"
-TAG_STBL = b"stbl"
-TAG_STSD = b"stsd"
-TAG_UUID = b"uuid"
-TAG_WAVE = b"wave"
+TAG_MOOV: Final = b"moov"
+TAG_UDTA: Final = b"udta"
+TAG_META: Final = b"meta"
+TAG_TRAK: Final = b"trak"
+TAG_MDIA: Final = b"mdia"
+TAG_MINF: Final = b"minf"
+TAG_STBL: Final = b"stbl"
+TAG_STSD: Final = b"stsd"
+TAG_UUID: Final = b"uuid"
+TAG_WAVE: Final = b"wave"
 
 # Visual sample entry types.
-TAG_AVC1 = b"avc1"
-TAG_MP4V = b"mp4v"
-TAG_ENCV = b"encv"
-TAG_S263 = b"s263"
-TAG_VP09 = b"vp09"
-TAG_AV01 = b"av01"
-TAG_HEV1 = b"hev1"
-TAG_DVH1 = b"dvh1"
+TAG_AVC1: Final = b"avc1"
+TAG_MP4V: Final = b"mp4v"
+TAG_ENCV: Final = b"encv"
+TAG_S263: Final = b"s263"
+TAG_VP09: Final = b"vp09"
+TAG_AV01: Final = b"av01"
+TAG_HEV1: Final = b"hev1"
+TAG_DVH1: Final = b"dvh1"
 
 # Sound sample descriptions.
-TAG_NONE = b"NONE"
-TAG_RAW_ = b"raw "
-TAG_TWOS = b"twos"
-TAG_SOWT = b"sowt"
-TAG_FL32 = b"fl32"
-TAG_FL64 = b"fl64"
-TAG_IN24 = b"in24"
-TAG_IN32 = b"in32"
-TAG_ULAW = b"ulaw"
-TAG_ALAW = b"alaw"
-TAG_LPCM = b"lpcm"
-TAG_MP4A = b"mp4a"
-TAG_OPUS = b"Opus"
-
-SOUND_SAMPLE_DESCRIPTIONS = frozenset([
+TAG_NONE: Final = b"NONE"
+TAG_RAW_: Final = b"raw "
+TAG_TWOS: Final = b"twos"
+TAG_SOWT: Final = b"sowt"
+TAG_FL32: Final = b"fl32"
+TAG_FL64: Final = b"fl64"
+TAG_IN24: Final = b"in24"
+TAG_IN32: Final = b"in32"
+TAG_ULAW: Final = b"ulaw"
+TAG_ALAW: Final = b"alaw"
+TAG_LPCM: Final = b"lpcm"
+TAG_MP4A: Final = b"mp4a"
+TAG_OPUS: Final = b"Opus"
+
+SOUND_SAMPLE_DESCRIPTIONS: Final = frozenset([
     TAG_NONE,
     TAG_RAW_,
     TAG_TWOS,
@@ -153,7 +108,7 @@ SOUND_SAMPLE_DESCRIPTIONS = frozenset([
     TAG_OPUS,
     ])
 
-VISUAL_SAMPLE_ENTRY_TYPES = frozenset([
+VISUAL_SAMPLE_ENTRY_TYPES: Final = frozenset([
     TAG_AVC1,
     TAG_MP4V,
     TAG_ENCV,
@@ -164,14 +119,71 @@ VISUAL_SAMPLE_ENTRY_TYPES = frozenset([
     TAG_DVH1
     ])
 
-CONTAINERS_LIST = frozenset([
-    TAG_MDIA,
-    TAG_MINF,
-    TAG_MOOV,
-    TAG_STBL,
-    TAG_STSD,
-    TAG_TRAK,
-    TAG_UDTA,
-    TAG_WAVE,
-    ]).union(SOUND_SAMPLE_DESCRIPTIONS).union(VISUAL_SAMPLE_ENTRY_TYPES)
+CONTAINERS_SET: Final = frozenset(itertools.chain(
+    (
+        TAG_MDIA,
+        TAG_MINF,
+        TAG_MOOV,
+        TAG_STBL,
+        TAG_STSD,
+        TAG_TRAK,
+        TAG_UDTA,
+        TAG_WAVE,
+    ),
+    SOUND_SAMPLE_DESCRIPTIONS,
+    VISUAL_SAMPLE_ENTRY_TYPES,
+    ))
+# Deprecated name of CONTAINERS_SET.
+CONTAINERS_LIST: Final = CONTAINERS_SET
+# Canonical instance of every known tag.
+_TAG_INTERN = {
+    tag: tag
+    for tag in (
+        TAG_STCO,
+        TAG_CO64,
+        TAG_FREE,
+        TAG_MDAT,
+        TAG_XML,
+        TAG_HDLR,
+        TAG_FTYP,
+        TAG_ESDS,
+        TAG_SOUN,
+        TAG_SA3D,
+        TAG_PRMD,
+        TAG_PRMR,
+        TAG_META,
+        TAG_UUID,
+        *CONTAINERS_SET,
+    )
+}
+
+
+def intern_tag(raw):
+  """Returns the canonical instance of a tag read from a file.
+
+  Box names of known types then are the constants above, so comparing them
+  with the constants hits the identity fast path of bytes equality.
+
+  Args:
+    raw: bytes, a four-character tag.
+
+  Returns:
+    The matching TAG_* constant, or raw if the tag is unknown.
+  """
+  return _TAG_INTERN.get(raw, raw)
+
+
+def fourcc(tag):
+  """Returns the big-endian unsigned 32-bit code of a four-character tag."""
+  return int.from_bytes(tag, "big")
+
 
+# The tag sets above as 32-bit codes, so that a box header can be decoded
+# with one struct unpack and its type checked with an int set lookup.
+SOUND_SAMPLE_DESCRIPTION_CODES: Final = frozenset(
+    map(fourcc, SOUND_SAMPLE_DESCRIPTIONS)
+)
+VISUAL_SAMPLE_ENTRY_CODES: Final = frozenset(
+    map(fourcc, VISUAL_SAMPLE_ENTRY_TYPES)
+)
+CONTAINER_CODES: Final = frozenset(map(fourcc, CONTAINERS_SET))
@@ -24,6 +24,9 @@ import struct
 from lut3d_utils.mpeg import box
 from lut3d_utils.mpeg import constants
 
+# Box size and type (as a 32-bit four-character code).
+_BOX_HEADER = struct.Struct(">II")
+
 
 def load(fh, position, end):
   """
@@ -42,12 +45,17 @@ def load(fh, position, end):
 
   fh.seek(position)
   header_size = 8
-  size = struct.unpack(">I", fh.read(4))[0]
-  name = fh.read(4)
+  header = fh.read(8)
+  if len(header) < 8:
+    print("Error: Box header exceeds bounds.")
+    return None
+  size, code = _BOX_HEADER.unpack(header)
 
-  if name not in constants.CONTAINERS_LIST:
+  if code not in constants.CONTAINER_CODES:
     return box.load(fh, position, end)
 
+  name = constants.intern_tag(header[4:])
+
   if size == 1:
     size = struct.unpack(">Q", fh.read(8))[0]
     header_size = 16
@@ -63,9 +71,9 @@ def load(fh, position, end):
   padding = 0
   if name == constants.TAG_STSD:
     padding = 8
-  if name in constants.VISUAL_SAMPLE_ENTRY_TYPES:
+  if code in constants.VISUAL_SAMPLE_ENTRY_CODES:
     padding = 78
-  if name in constants.SOUND_SAMPLE_DESCRIPTIONS:
+  if code in constants.SOUND_SAMPLE_DESCRIPTION_CODES:
     current_pos = fh.tell()
     fh.seek(current_pos + 8)
     sample_description_version = struct.unpack(">h", fh.read(2))[0]
@@ -119,9 +127,30 @@ class Container(box.Box):
     self.content_size = 0
     self.contents = list()
     self.padding = padding
+    self._index = None
+
+  @property
+  def index(self):
+    """Maps each tag to the list of direct sub-boxes with that tag.
+
+    The mapping is built lazily on first access and dropped whenever the
+    contents are changed through add() or remove().
+
+    Returns:
+      Dict, tag (bytes) to list of boxes in file order.
+    """
+    if self._index is None:
+      self._index = dict()
+      for element in self.contents:
+        self._index.setdefault(element.name, []).append(element)
+    return self._index
 
   def resize(self):
-    """Recomputes the box size and recurses on contents."""
+    """Recomputes the box size and recurses on contents.
+
+    add() and remove() do not update content_size, so this must be called
+    once after a batch of edits and before the sizes are used.
+    """
     self.content_size = self.padding
     for element in self.contents:
       if isinstance(element, Container):
@@ -151,20 +180,24 @@ class Container(box.Box):
       element.print_structure(next_indent)
 
   def remove(self, tag):
-    """Removes a tag recursively from all containers."""
+    """Removes a tag recursively from all containers.
+
+    The box sizes are left stale until resize() is called.
+    """
     new_contents = []
-    self.content_size = 0
     for element in self.contents:
       if element.name != tag:
         new_contents.append(element)
         if isinstance(element, Container):
           element.remove(tag)
-        self.content_size += element.size()
     self.contents = new_contents
+    self._index = None
 
   def add(self, element):
     """Adds an element, merging with containers of the same type.
 
+        The box sizes are left stale until resize() is called.
+
         Returns:
           Int, increased size of container.
     """
@@ -176,6 +209,7 @@ class Container(box.Box):
         return False
 
     self.contents.append(element)
+    self._index = None
     return True
 
   def merge(self, element):
@@ -88,6 +88,7 @@ class Mpeg4Container(container.Container):
     self.ftyp_box = None
     self.first_mdat_position = None
     self.padding = 0
+    self._index = None
 
   def merge(self, element):
     """Mpeg4 containers do not support merging."""